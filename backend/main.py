@@ -1,12 +1,18 @@
-import asyncio
 import logging
+import httpx
 from fastapi import FastAPI, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
-from openai import OpenAI
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
 import os
 
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:  # uvloop doesn't support Windows; fall back to asyncio
+    uvloop = None
+
 load_dotenv()
 
 from pdf_loader import load_pdf_chunks_and_embeddings, get_relevant_chunks
@@ -30,8 +36,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Initialize async OpenAI client so streaming never blocks the event loop.
+# HTTP/2 multiplexes concurrent chat and embedding calls over a few
+# keep-alive connections instead of handshaking per request.
+client = AsyncOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    http_client=httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    ),
+)
 
 # Global variables to store PDF chunks and their embeddings
 chunks = []
@@ -52,30 +66,22 @@ async def startup_event():
 # Handle streaming of OpenAI responses
 async def openai_stream(messages):
     """
-    Stream responses from OpenAI's API with a natural typing delay.
-    
+    Stream responses from OpenAI's API as fast as the model produces them.
+
     Args:
         messages: List of message objects for the chat completion
-        
+
     Yields:
         str: Tokens from the AI response
     """
-    def sync_stream():
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
-            stream=True
-        )
-        for chunk in response:
-            content = getattr(chunk.choices[0].delta, "content", "")
-            yield content or ""
-
-    async def async_generator():
-        for token in sync_stream():
-            await asyncio.sleep(0.015)  # Simulate natural typing delay
-            yield token
-
-    return async_generator()
+    response = await client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=messages,
+        stream=True
+    )
+    async for chunk in response:
+        content = getattr(chunk.choices[0].delta, "content", "")
+        yield content or ""
 
 # Main chat endpoint that handles user messages and returns AI responses
 @app.get("/chat")
@@ -93,7 +99,7 @@ async def chat_get(
     Returns:
         StreamingResponse: Server-sent events stream of AI response tokens
     """
-    relevant_chunks = await get_relevant_chunks(message, chunks, embeddings, top_k=3)
+    relevant_chunks = await get_relevant_chunks(message, top_k=3)
     context_text = "\n\n".join(relevant_chunks)
 
     messages = [
@@ -103,8 +109,16 @@ async def chat_get(
     ]
 
     async def event_generator():
-        async for token in await openai_stream(messages):
+        async for token in openai_stream(messages):
             yield f"data: {token}\n\n"
         yield "data: [DONE]\n\n"  # Signal end of stream
 
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            # Stop reverse proxies from buffering the event stream
+            "X-Accel-Buffering": "no",
+            "Cache-Control": "no-cache",
+        },
+    )
@@ -1,13 +1,26 @@
 import json
 import os
+import time
+import random
+import asyncio
+import hashlib
 import logging
+import sqlite3
+import functools
+import httpx
 import numpy as np
 from typing import List, Tuple, Optional
 from fastapi.concurrency import run_in_threadpool
-from openai import OpenAI
+from tqdm.asyncio import tqdm
+from openai import OpenAI, RateLimitError, BadRequestError
 from dotenv import load_dotenv
 import os
 
+try:
+    import faiss
+except ImportError:  # ANN search is optional; the matrix scan still works
+    faiss = None
+
 load_dotenv()
 
 # Set up logging
@@ -17,72 +30,307 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Initialize OpenAI client on a shared HTTP/2 pool so concurrent embedding
+# batches multiplex over a few keep-alive connections
+client = OpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    http_client=httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    ),
+)
+
+# Embedding settings. The model supports Matryoshka truncation, so asking
+# for 1024 dims keeps ranking quality while moving 3x less data per query.
+EMBEDDING_MODEL = "text-embedding-3-large"
+EMBEDDING_DIMENSIONS = 1024
+EMBEDDING_BATCH_SIZE = 128
+EMBEDDING_CONCURRENCY = 5
+MAX_EMBEDDING_RETRIES = 5
+QUERY_CACHE_SIZE = 4096
 
+# Persistent per-chunk embedding cache, keyed by content hash so edits to
+# a document only re-embed the chunks that actually changed
+EMBEDDING_CACHE_DB = os.getenv("EMBEDDING_CACHE_DB", "embedding_cache.db")
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+# Scan the quantized int8 copy of the chunk matrix instead of the float32
+# original (4x less memory traffic); set INT8_SCAN=0 to force float32.
+USE_INT8_SCAN = os.getenv("INT8_SCAN", "1").lower() not in ("0", "false")
+
+# HNSW graph parameters (neighbors per node / construction beam width)
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+
+# Chunk texts and their normalized embedding matrix, set once when the PDF
+# is loaded so the request path never rebuilds per-query arrays
+_chunks_arr: Optional[np.ndarray] = None
+_embeddings_mat: Optional[np.ndarray] = None
+
+# Quantized copy of the chunk matrix, set when embeddings are loaded
+_int8_matrix: Optional[np.ndarray] = None
+_int8_scales: Optional[np.ndarray] = None
+
+# FAISS HNSW index over the chunk matrix, set when embeddings are loaded
+_faiss_index = None
+
+
+def extract_pages_from_pdf(pdf_path: str):
     """
-    Extract text content from a PDF file using PyPDF2.
-    
+    Yield the text of each page of a PDF file using PyPDF2.
+
+    Streaming page-by-page keeps memory at O(page) and lets downstream
+    chunking/embedding start before the whole document is parsed.
+
     Args:
         pdf_path: Path to the PDF file
-        
-    Returns:
-        str: Extracted text content
-        
+
+    Yields:
+        str: Extracted text of one page
+
     Raises:
         FileNotFoundError: If the PDF file doesn't exist
         Exception: For any other extraction errors
     """
     from PyPDF2 import PdfReader
-    
+
     try:
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"PDF file not found at {pdf_path}")
-            
+
         reader = PdfReader(pdf_path)
-        text = ""
+        extracted_any = False
         for page in reader.pages:
-            text += page.extract_text() or ""
-            
-        if not text.strip():
+            page_text = page.extract_text() or ""
+            if page_text.strip():
+                extracted_any = True
+            yield page_text
+
+        if not extracted_any:
             logger.warning(f"No text could be extracted from {pdf_path}")
-            
-        return text
-        
+
     except Exception as e:
         logger.error(f"Error extracting text from {pdf_path}: {str(e)}")
         raise
 
-def split_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[str]:
+def extract_text_from_pdf(pdf_path: str) -> str:
     """
-    Split text into overlapping chunks.
-    
+    Extract the full text content of a PDF file.
+
+    Args:
+        pdf_path: Path to the PDF file
+
+    Returns:
+        str: Extracted text content
+
+    Raises:
+        FileNotFoundError: If the PDF file doesn't exist
+        Exception: For any other extraction errors
+    """
+    return "".join(extract_pages_from_pdf(pdf_path))
+
+@functools.lru_cache(maxsize=1)
+def _get_encoding():
+    """Load the cl100k_base BPE encoding used by the embedding models."""
+    import tiktoken
+    return tiktoken.get_encoding("cl100k_base")
+
+def split_text(text: str, chunk_size: int = 250, chunk_overlap: int = 50) -> List[str]:
+    """
+    Split text into overlapping chunks of tokens.
+
+    Slicing BPE token ids (via tiktoken's Rust tokenizer) instead of raw
+    characters keeps word boundaries intact and guarantees chunks stay
+    under the embeddings API token limit.
+
     Args:
         text: Input text to split
-        chunk_size: Maximum size of each chunk
-        chunk_overlap: Number of characters to overlap between chunks
-        
+        chunk_size: Maximum number of tokens per chunk
+        chunk_overlap: Number of tokens to overlap between chunks
+
     Returns:
         List[str]: List of text chunks
     """
     if not text:
         logger.warning("Empty text provided for splitting")
         return []
-        
-    chunks = []
-    start = 0
-    text_len = len(text)
-    
-    while start < text_len:
-        end = min(start + chunk_size, text_len)
-        chunks.append(text[start:end])
-        start += chunk_size - chunk_overlap
-        
+
+    enc = _get_encoding()
+    ids = enc.encode(text)
+    stride = chunk_size - chunk_overlap
+    chunks = [enc.decode(ids[i:i + chunk_size]) for i in range(0, len(ids), stride)]
+
     logger.debug(f"Split text into {len(chunks)} chunks")
     return chunks
 
+def split_text_stream(pieces, chunk_size: int = 250, chunk_overlap: int = 50):
+    """
+    Split an iterable of text pieces into overlapping token chunks as they
+    arrive, buffering only about one chunk's worth of tokens.
+
+    Args:
+        pieces: Iterable of text fragments (e.g. PDF pages)
+        chunk_size: Maximum number of tokens per chunk
+        chunk_overlap: Number of tokens to overlap between chunks
+
+    Yields:
+        str: Text chunks
+    """
+    enc = _get_encoding()
+    stride = chunk_size - chunk_overlap
+    buffer: List[int] = []
+    for piece in pieces:
+        if not piece:
+            continue
+        buffer.extend(enc.encode(piece))
+        while len(buffer) >= chunk_size:
+            yield enc.decode(buffer[:chunk_size])
+            buffer = buffer[stride:]
+    # Drain the tail the same way split_text does: one window per stride
+    # position until fewer than stride tokens remain
+    while buffer:
+        yield enc.decode(buffer[:chunk_size])
+        if len(buffer) <= stride:
+            break
+        buffer = buffer[stride:]
+
+def _embed_batch(batch: List[str]) -> List[List[float]]:
+    """
+    Embed a batch of texts with a single OpenAI API call.
+
+    Retries with exponential backoff when rate limited, and recursively
+    splits the batch in half if it exceeds the API's token limit.
+
+    Args:
+        batch: List of text strings to embed in one request
+
+    Returns:
+        List[List[float]]: Embedding vectors in the same order as the input
+
+    Raises:
+        Exception: If the request keeps failing after all retries
+    """
+    for attempt in range(MAX_EMBEDDING_RETRIES):
+        try:
+            response = client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                dimensions=EMBEDDING_DIMENSIONS,
+                input=batch,
+            )
+            # The API tags each result with its input index; sort to be safe
+            return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+        except RateLimitError:
+            delay = 2 ** attempt
+            logger.warning(f"Rate limited by embeddings API, retrying in {delay}s...")
+            time.sleep(delay)
+        except BadRequestError as e:
+            if len(batch) > 1 and "token" in str(e).lower():
+                logger.warning(f"Batch of {len(batch)} texts too large, splitting in half")
+                mid = len(batch) // 2
+                return _embed_batch(batch[:mid]) + _embed_batch(batch[mid:])
+            raise
+
+    raise RuntimeError(f"Embeddings API still rate limited after {MAX_EMBEDDING_RETRIES} retries")
+
+def _cache_key(text: str) -> str:
+    """Content hash identifying a chunk's embedding for the current model/dim."""
+    payload = f"{EMBEDDING_MODEL}:{EMBEDDING_DIMENSIONS}:{text}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _open_embedding_cache() -> sqlite3.Connection:
+    """Open the persistent embedding cache, creating the table if needed."""
+    conn = sqlite3.connect(EMBEDDING_CACHE_DB)
+    conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB)")
+    return conn
+
+def _embed_batch_cached(batch: List[str]) -> List[List[float]]:
+    """
+    Embed a batch of texts, reusing persistently cached vectors.
+
+    Cache hits are served from SQLite; only the misses go to the API, and
+    their vectors are written back so later runs (and process restarts)
+    reuse them. Any cache failure falls back to embedding the full batch.
+
+    Args:
+        batch: List of text strings to embed
+
+    Returns:
+        List[List[float]]: Embedding vectors in the same order as the input
+    """
+    try:
+        keys = [_cache_key(text) for text in batch]
+        conn = _open_embedding_cache()
+        try:
+            placeholders = ",".join("?" * len(keys))
+            rows = conn.execute(
+                f"SELECT key, vec FROM embeddings WHERE key IN ({placeholders})", keys
+            ).fetchall()
+            cached = {
+                key: np.frombuffer(blob, dtype=np.float32).tolist()
+                for key, blob in rows
+            }
+
+            miss_indices = [i for i, key in enumerate(keys) if key not in cached]
+            if miss_indices:
+                fresh = _embed_batch([batch[i] for i in miss_indices])
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)",
+                    [
+                        (keys[i], np.asarray(vec, dtype=np.float32).tobytes())
+                        for i, vec in zip(miss_indices, fresh)
+                    ],
+                )
+                conn.commit()
+                for i, vec in zip(miss_indices, fresh):
+                    cached[keys[i]] = vec
+
+            if len(miss_indices) < len(batch):
+                logger.debug(
+                    f"Embedding cache served {len(batch) - len(miss_indices)}/{len(batch)} chunks"
+                )
+            return [cached[key] for key in keys]
+        finally:
+            conn.close()
+
+    except sqlite3.Error as e:
+        logger.warning(f"Embedding cache unavailable ({str(e)}); embedding without it")
+        return _embed_batch(batch)
+
+@functools.lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _embed_query_cached(text: str) -> Tuple[float, ...]:
+    """
+    Embed a single query, memoized so repeated queries skip the API call.
+
+    Args:
+        text: Query text to embed
+
+    Returns:
+        Tuple[float, ...]: Embedding vector (a tuple so lru_cache can store it)
+    """
+    response = client.embeddings.create(
+        model=EMBEDDING_MODEL,
+        dimensions=EMBEDDING_DIMENSIONS,
+        input=text,
+    )
+    return tuple(response.data[0].embedding)
+
+async def embed_query(text: str) -> np.ndarray:
+    """
+    Embed a single query and return a normalized float32 vector.
+
+    Dedicated fast path for the request-time lookup: one cached API call,
+    one array, no batch scaffolding.
+
+    Args:
+        text: Query text to embed
+
+    Returns:
+        np.ndarray: Unit-length float32 embedding vector
+    """
+    vector = await run_in_threadpool(_embed_query_cached, text)
+    q = np.ascontiguousarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(q)
+    return q / norm if norm else q
+
 async def embed_texts(texts: List[str]) -> List[List[float]]:
     """
     Generate embeddings for a list of text chunks using OpenAI's API.
@@ -101,125 +349,452 @@ async def embed_texts(texts: List[str]) -> List[List[float]]:
         return []
         
     try:
-        embeddings = []
         logger.info(f"Generating embeddings for {len(texts)} text chunks...")
-        
-        for text in texts:
-            response = await run_in_threadpool(
-                lambda: client.embeddings.create(
-                    model="text-embedding-3-large",
-                    input=text,
-                )
-            )
-            embeddings.append(response.data[0].embedding)
-            
+
+        # Run batches concurrently, bounded by a semaphore to stay under
+        # the API rate limit; each task writes into its own output slice.
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        sem = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+
+        async def _embed_slice(start: int, batch: List[str]) -> None:
+            # Small random jitter so concurrent batches don't hit the API at once
+            await asyncio.sleep(random.uniform(0, 0.05))
+            async with sem:
+                embeddings[start:start + len(batch)] = await run_in_threadpool(_embed_batch_cached, batch)
+
+        tasks = [
+            asyncio.ensure_future(_embed_slice(i, texts[i:i + EMBEDDING_BATCH_SIZE]))
+            for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+        ]
+        # Surface live batch counts while the gather runs; cached vectors
+        # in the SQLite store mean a crash only loses the batch in flight
+        for task in tqdm.as_completed(tasks, total=len(tasks), desc="Embedding batches",
+                                      disable=len(tasks) <= 1):
+            await task
+
         logger.info(f"Successfully generated {len(embeddings)} embeddings")
         return embeddings
-        
+
     except Exception as e:
         logger.error(f"Error generating embeddings: {str(e)}")
         raise
 
-def save_embeddings(filepath: str, chunks: List[str], embeddings: List[List[float]]) -> None:
+# Sentinel marking the end of the chunk stream during ingest
+_EXTRACT_DONE = object()
+
+async def _extract_and_embed_pdf(pdf_path: str) -> Tuple[List[str], List[List[float]]]:
     """
-    Save text chunks and their embeddings to a JSON file.
-    
+    Parse a PDF and embed its chunks concurrently.
+
+    A producer task pulls pages through the streaming chunker while a
+    consumer task batches finished chunks and fires embedding requests,
+    so parsing overlaps with network latency instead of preceding it.
+
     Args:
-        filepath: Path to save the embeddings
+        pdf_path: Path to the PDF file
+
+    Returns:
+        Tuple containing:
+            - List of text chunks
+            - List of corresponding embedding vectors
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * EMBEDDING_BATCH_SIZE)
+    chunks: List[str] = []
+    sem = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+
+    async def _embed(start: int, batch: List[str]):
+        await asyncio.sleep(random.uniform(0, 0.05))
+        async with sem:
+            return start, await run_in_threadpool(_embed_batch_cached, batch)
+
+    async def _produce() -> None:
+        chunk_iter = split_text_stream(extract_pages_from_pdf(pdf_path))
+        while True:
+            chunk = await run_in_threadpool(next, chunk_iter, _EXTRACT_DONE)
+            if chunk is _EXTRACT_DONE:
+                break
+            await queue.put(chunk)
+        await queue.put(None)
+
+    async def _consume() -> List[List[float]]:
+        tasks = []
+        batch: List[str] = []
+        start = 0
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                break
+            chunks.append(chunk)
+            batch.append(chunk)
+            if len(batch) == EMBEDDING_BATCH_SIZE:
+                tasks.append(asyncio.create_task(_embed(start, batch)))
+                start += len(batch)
+                batch = []
+        if batch:
+            tasks.append(asyncio.create_task(_embed(start, batch)))
+
+        embeddings: List[Optional[List[float]]] = [None] * (start + len(batch))
+        for task in tqdm.as_completed(tasks, total=len(tasks), desc="Embedding batches",
+                                      disable=len(tasks) <= 1):
+            base, vectors = await task
+            embeddings[base:base + len(vectors)] = vectors
+        return embeddings
+
+    _, embeddings = await asyncio.gather(_produce(), _consume())
+    return chunks, embeddings
+
+def _file_sha256(path: str) -> Optional[str]:
+    """Hash a file's contents, or None if it can't be read."""
+    try:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    except OSError as e:
+        logger.warning(f"Could not hash {path}: {str(e)}")
+        return None
+
+def _retire_cache(filepath: str) -> None:
+    """
+    Set aside stale cache files as .old instead of deleting them.
+
+    Keeping the previous model's vectors around makes it possible to
+    compare old and new rankings during a model transition.
+    """
+    for suffix in (".npy", ".chunks.json", ".hnsw"):
+        path = f"{filepath}{suffix}"
+        if os.path.exists(path):
+            os.replace(path, f"{path}.old")
+            logger.info(f"Kept stale cache file as {path}.old")
+
+def save_embeddings(
+    filepath: str,
+    chunks: List[str],
+    embeddings: List[List[float]],
+    pdf_sha: Optional[str] = None
+) -> None:
+    """
+    Save embeddings as a binary .npy file with a JSON sidecar for the chunks.
+
+    float32 binary storage is ~5x smaller than JSON-encoded floats and
+    loads without any text parsing. The sidecar header records the model,
+    dimension and source-PDF hash the cache was built from.
+
+    Args:
+        filepath: Base path for the cache files (extensions are appended)
         chunks: List of text chunks
         embeddings: List of corresponding embedding vectors
-        
+        pdf_sha: SHA-256 of the source PDF, if known
+
     Raises:
-        IOError: If there's an error writing to the file
+        IOError: If there's an error writing the files
     """
     try:
-        to_save = [{"text": chunk, "embedding": emb} for chunk, emb in zip(chunks, embeddings)]
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(to_save, f)
-        logger.info(f"Saved {len(chunks)} chunks and embeddings to {filepath}")
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        np.save(f"{filepath}.npy", matrix)
+        sidecar = {
+            "model": EMBEDDING_MODEL,
+            "dimensions": int(matrix.shape[1]) if matrix.ndim == 2 else EMBEDDING_DIMENSIONS,
+            "pdf_sha": pdf_sha,
+            "chunks": chunks,
+        }
+        with open(f"{filepath}.chunks.json", "w", encoding="utf-8") as f:
+            json.dump(sidecar, f)
+        logger.info(f"Saved {len(chunks)} chunks and embeddings to {filepath}.npy")
     except IOError as e:
         logger.error(f"Error saving embeddings to {filepath}: {str(e)}")
         raise
 
-def load_embeddings(filepath: str) -> Tuple[Optional[List[str]], Optional[List[List[float]]]]:
+def load_embeddings(
+    filepath: str,
+    pdf_sha: Optional[str] = None
+) -> Tuple[Optional[List[str]], Optional[np.ndarray]]:
     """
-    Load text chunks and their embeddings from a JSON file.
-    
+    Load text chunks and their embeddings from the binary cache.
+
+    The .npy file is memory-mapped, so startup reads no float data until
+    it is actually used. A cache whose header doesn't match the current
+    model, dimension or source-PDF hash is set aside as .old and treated
+    as missing so the caller re-embeds. Falls back to the legacy combined
+    JSON format if only that is present.
+
     Args:
-        filepath: Path to the embeddings file
-        
+        filepath: Base path for the cache files (extensions are appended)
+        pdf_sha: SHA-256 of the source PDF to validate against, if known
+
     Returns:
         Tuple containing:
             - List of text chunks (or None if not found)
-            - List of embedding vectors (or None if not found)
+            - float32 embeddings matrix (or None if not found)
     """
-    if not os.path.exists(filepath):
-        logger.warning(f"Embeddings file not found at {filepath}")
-        return None, None
-        
+    npy_path = f"{filepath}.npy"
+    chunks_path = f"{filepath}.chunks.json"
+    legacy_path = f"{filepath}.json"
+
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            
-        chunks = [item["text"] for item in data]
-        embeddings = [item["embedding"] for item in data]
-        
-        logger.info(f"Loaded {len(chunks)} chunks and embeddings from {filepath}")
-        return chunks, embeddings
-        
-    except (json.JSONDecodeError, KeyError, IOError) as e:
+        if os.path.exists(npy_path) and os.path.exists(chunks_path):
+            with open(chunks_path, "r", encoding="utf-8") as f:
+                sidecar = json.load(f)
+            if isinstance(sidecar, dict):
+                chunks = sidecar["chunks"]
+                model = sidecar.get("model")
+                dims = sidecar.get("dimensions")
+                cached_sha = sidecar.get("pdf_sha")
+            else:  # sidecar written before metadata was added
+                chunks, model, dims, cached_sha = sidecar, None, None, None
+            if (model, dims) != (EMBEDDING_MODEL, EMBEDDING_DIMENSIONS):
+                logger.info(
+                    f"Embeddings cache was built with {model}/{dims}, "
+                    f"expected {EMBEDDING_MODEL}/{EMBEDDING_DIMENSIONS}; re-embedding"
+                )
+                _retire_cache(filepath)
+                return None, None
+            if pdf_sha is not None and cached_sha is not None and cached_sha != pdf_sha:
+                logger.info("Source PDF changed since the cache was built; re-embedding")
+                _retire_cache(filepath)
+                return None, None
+            embeddings = np.load(npy_path, mmap_mode="r")
+            logger.info(f"Loaded {len(chunks)} chunks and embeddings from {npy_path}")
+            return chunks, embeddings
+
+        if os.path.exists(legacy_path):
+            logger.info(f"Loading legacy JSON embeddings from {legacy_path}")
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            chunks = [item["text"] for item in data]
+            embeddings = np.asarray([item["embedding"] for item in data], dtype=np.float32)
+            if embeddings.ndim != 2 or embeddings.shape[1] != EMBEDDING_DIMENSIONS:
+                logger.info(
+                    f"Legacy cache has {embeddings.shape[-1]}-dim vectors, "
+                    f"expected {EMBEDDING_DIMENSIONS}; re-embedding"
+                )
+                return None, None
+            return chunks, embeddings
+
+        logger.warning(f"Embeddings cache not found at {npy_path}")
+        return None, None
+
+    except (json.JSONDecodeError, KeyError, IOError, ValueError) as e:
         logger.error(f"Error loading embeddings from {filepath}: {str(e)}")
         return None, None
 
-def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
+def _as_normalized_matrix(embeddings) -> np.ndarray:
     """
-    Calculate cosine similarity between two vectors.
-    
+    Convert stored embeddings to a row-normalized float32 matrix.
+
+    With unit-length rows, cosine similarity against a unit-length query
+    reduces to a single matrix-vector product.
+
     Args:
-        a: First vector
-        b: Second vector
-        
+        embeddings: List of embedding vectors (or an existing 2-D array)
+
+    Returns:
+        np.ndarray: 2-D float32 array with L2-normalized rows
+    """
+    mat = np.ascontiguousarray(np.asarray(embeddings), dtype=np.float32)
+    if mat.size == 0:
+        # A PDF with no extractable text yields no chunks; an empty array is
+        # 1-D, so give it an explicit 2-D shape for the downstream matmuls
+        return np.empty((0, EMBEDDING_DIMENSIONS), dtype=np.float32)
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    mat = mat / norms
+
+    # BLAS only takes its fast GEMV path on contiguous float32 input;
+    # anything else silently doubles memory traffic through a hidden copy
+    if not mat.flags["C_CONTIGUOUS"] or mat.dtype != np.float32:
+        logger.warning("Normalized matrix was not contiguous float32; fixing layout")
+        mat = np.ascontiguousarray(mat, dtype=np.float32)
+    return mat
+
+def _prepare_matrix(embeddings, index_path: Optional[str] = None) -> np.ndarray:
+    """
+    Normalize loaded embeddings and refresh the derived search structures.
+
+    Rebuilds the quantized scan copy and, when FAISS is installed, the
+    HNSW index (loaded from index_path if a matching one was persisted).
+
+    Args:
+        embeddings: List of embedding vectors (or an existing 2-D array)
+        index_path: Optional path to persist/load the HNSW index
+
+    Returns:
+        np.ndarray: Row-normalized float32 matrix
+    """
+    global _int8_matrix, _int8_scales, _faiss_index
+    matrix = _as_normalized_matrix(embeddings)
+    if len(matrix) == 0:
+        _int8_matrix, _int8_scales = None, None
+        _faiss_index = None
+        return matrix
+    _int8_matrix, _int8_scales = _quantize_rows(matrix)
+    _faiss_index = _build_faiss_index(matrix, index_path)
+    return matrix
+
+def _cache_pdf_state(
+    chunks: List[str],
+    embeddings,
+    index_path: Optional[str] = None
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Populate the module-level chunk/matrix cache used by the request path.
+
+    Args:
+        chunks: List of text chunks
+        embeddings: Corresponding embedding vectors (list or 2-D array)
+        index_path: Optional path to persist/load the HNSW index
+
+    Returns:
+        Tuple of the chunks and the normalized float32 matrix
+    """
+    global _chunks_arr, _embeddings_mat
+    matrix = _prepare_matrix(embeddings, index_path)
+    _chunks_arr = np.array(chunks, dtype=object)
+    _embeddings_mat = matrix
+    return chunks, matrix
+
+def _build_faiss_index(matrix: np.ndarray, index_path: Optional[str] = None):
+    """
+    Build (or load) an HNSW index over the normalized chunk matrix.
+
+    With unit-length rows, inner product search through the index returns
+    the same ranking as the cosine scan, in sub-linear time.
+
+    Args:
+        matrix: Row-normalized float32 chunk matrix
+        index_path: Optional path to persist/load the index
+
     Returns:
-        float: Cosine similarity score between -1 and 1
+        faiss.Index or None if FAISS is unavailable or the build fails
     """
+    if faiss is None:
+        logger.info("FAISS not installed; using brute-force similarity scan")
+        return None
+
     try:
-        return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+        if index_path and os.path.exists(index_path):
+            index = faiss.read_index(index_path)
+            if index.ntotal == len(matrix) and index.d == matrix.shape[1]:
+                logger.info(f"Loaded HNSW index for {index.ntotal} chunks from {index_path}")
+                return index
+            logger.info(f"Persisted HNSW index at {index_path} is stale, rebuilding")
+
+        index = faiss.IndexHNSWFlat(matrix.shape[1], HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.add(np.ascontiguousarray(matrix))
+        if index_path:
+            faiss.write_index(index, index_path)
+            logger.info(f"Built and saved HNSW index for {index.ntotal} chunks to {index_path}")
+        return index
+
     except Exception as e:
-        logger.error(f"Error calculating cosine similarity: {str(e)}")
-        return 0.0
+        logger.error(f"Error building HNSW index: {str(e)}")
+        return None
+
+def _quantize_rows(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize a float matrix to int8 with a per-row scale factor.
+
+    Each row is scaled so its largest absolute value maps to 127; dividing
+    int8 dot products by the scales recovers approximate float scores.
+
+    Args:
+        matrix: 2-D float array to quantize
+
+    Returns:
+        Tuple containing:
+            - int8 matrix of the same shape
+            - float32 per-row scale factors
+    """
+    max_abs = np.max(np.abs(matrix), axis=1)
+    scales = (127.0 / np.where(max_abs == 0, 1.0, max_abs)).astype(np.float32)
+    quantized = np.round(matrix * scales[:, None]).astype(np.int8)
+    return quantized, scales
+
+def _int8_scores(query: np.ndarray) -> np.ndarray:
+    """
+    Score the quantized chunk matrix against a float query vector.
+
+    Args:
+        query: Normalized float32 query vector
+
+    Returns:
+        np.ndarray: Approximate cosine scores, one per chunk
+    """
+    max_abs = np.max(np.abs(query))
+    qscale = np.float32(127.0 / (max_abs if max_abs else 1.0))
+    q_int = np.round(query * qscale).astype(np.int8)
+    # Accumulate in int32: an int8 dot product can reach 127*127 per term
+    # (~16.5M at 1024 dims), far beyond the int16 range
+    raw = _int8_matrix.astype(np.int32) @ q_int.astype(np.int32)
+    return raw.astype(np.float32) / (_int8_scales * qscale)
 
 async def get_relevant_chunks(
-    query: str, 
-    chunks: List[str], 
-    embeddings: List[List[float]], 
+    query: str,
+    chunks: Optional[List[str]] = None,
+    embeddings: Optional[np.ndarray] = None,
     top_k: int = 5
 ) -> List[str]:
     """
     Find the most relevant text chunks for a given query using semantic search.
-    
+
     Args:
         query: Search query
-        chunks: List of text chunks to search through
-        embeddings: Corresponding embeddings for the chunks
+        chunks: Text chunks to search (defaults to the loaded PDF's chunks)
+        embeddings: Normalized embedding matrix for the chunks (defaults to
+            the matrix cached at load time)
         top_k: Number of top results to return
-        
+
     Returns:
         List[str]: Top-k most relevant text chunks
     """
-    if not chunks or not embeddings:
+    if chunks is None:
+        chunks = _chunks_arr
+    if embeddings is None:
+        embeddings = _embeddings_mat
+
+    if chunks is None or len(chunks) == 0 or embeddings is None or len(embeddings) == 0:
         logger.warning("No chunks or embeddings provided for search")
         return []
-        
+
     try:
         logger.debug(f"Finding relevant chunks for query: {query[:100]}...")
-        query_emb_list = await embed_texts([query])
-        query_emb = query_emb_list[0]
-        
-        scores = [cosine_similarity(np.array(query_emb), np.array(emb)) for emb in embeddings]
-        ranked = sorted(zip(chunks, scores), key=lambda x: x[1], reverse=True)
-        
-        logger.debug(f"Top result score: {ranked[0][1]:.3f} (query: {query[:50]}...)")
-        return [chunk for chunk, score in ranked[:top_k]]
+        q = await embed_query(query)
+
+        matrix = (
+            embeddings if isinstance(embeddings, np.ndarray)
+            else _as_normalized_matrix(embeddings)
+        )
+
+        # Prefer the HNSW index: sub-linear search with the same ranking as
+        # the cosine scan on unit-length vectors. The index (like the int8
+        # copy below) is built from the loaded PDF's matrix, so only use it
+        # when the caller is searching that exact corpus.
+        if (
+            _faiss_index is not None
+            and embeddings is _embeddings_mat
+            and _faiss_index.ntotal == len(chunks)
+        ):
+            distances, indices = _faiss_index.search(q[None, :], min(top_k, len(chunks)))
+            top_idx = [i for i in indices[0] if i != -1]
+            logger.debug(f"Top result score: {distances[0][0]:.3f} (query: {query[:50]}...)")
+            return [chunks[i] for i in top_idx]
+
+        # One matrix-vector product scores every chunk at once; argpartition
+        # then pulls the top-k without sorting the full score array. The
+        # quantized copy moves 4x fewer bytes through cache when available.
+        if USE_INT8_SCAN and _int8_matrix is not None and matrix is _embeddings_mat:
+            scores = _int8_scores(q)
+        else:
+            scores = matrix @ q
+        top_k = min(top_k, len(chunks))
+        top_idx = np.argpartition(scores, -top_k)[-top_k:]
+        # Order just the k winners; Python never touches the other N-k scores
+        top_idx = top_idx[np.argsort(scores[top_idx])[::-1]]
+
+        logger.debug(f"Top result score: {scores[top_idx[0]]:.3f} (query: {query[:50]}...)")
+        return [chunks[i] for i in top_idx]
         
     except Exception as e:
         logger.error(f"Error finding relevant chunks: {str(e)}")
@@ -227,41 +802,37 @@ async def get_relevant_chunks(
 
 async def load_pdf_chunks_and_embeddings(
     pdf_path: str, 
-    embeddings_path: str = "pdf_embeddings.json"
-) -> Tuple[List[str], List[List[float]]]:
+    embeddings_path: str = "pdf_embeddings"
+) -> Tuple[List[str], np.ndarray]:
     """
     Load or generate PDF chunks and their embeddings.
-    
+
     Args:
         pdf_path: Path to the PDF file
-        embeddings_path: Path to save/load embeddings
-        
+        embeddings_path: Base path for the embeddings cache files
+
     Returns:
         Tuple containing:
             - List of text chunks
-            - List of corresponding embedding vectors
+            - Row-normalized float32 matrix of corresponding embeddings
     """
-    # Try to load cached embeddings first
-    chunks, embeddings = load_embeddings(embeddings_path)
+    # Try to load cached embeddings first, validated against the source PDF
+    pdf_sha = _file_sha256(pdf_path) if os.path.exists(pdf_path) else None
+    chunks, embeddings = load_embeddings(embeddings_path, pdf_sha)
     if chunks is not None and embeddings is not None:
         logger.info(f"Using cached embeddings from {embeddings_path}")
-        return chunks, embeddings
+        return _cache_pdf_state(chunks, embeddings, f"{embeddings_path}.hnsw")
 
-    # If no cache, process the PDF
+    # If no cache, process the PDF with parsing and embedding overlapped
     logger.info(f"Processing PDF: {pdf_path}")
     try:
-        text = extract_text_from_pdf(pdf_path)
-        logger.info(f"Extracted {len(text)} characters from PDF")
-        
-        chunks = split_text(text)
-        logger.info(f"Split PDF into {len(chunks)} chunks")
-        
-        embeddings = await embed_texts(chunks)
+        chunks, embeddings = await _extract_and_embed_pdf(pdf_path)
+        logger.info(f"Split PDF into {len(chunks)} chunks and embedded them")
         
         # Save the embeddings for future use
-        save_embeddings(embeddings_path, chunks, embeddings)
-        
-        return chunks, embeddings
+        save_embeddings(embeddings_path, chunks, embeddings, pdf_sha)
+
+        return _cache_pdf_state(chunks, embeddings, f"{embeddings_path}.hnsw")
         
     except Exception as e:
         logger.error(f"Failed to process PDF {pdf_path}: {str(e)}")